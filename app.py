@@ -1,30 +1,53 @@
 import os
+import sys
 from flask import Flask
-from sqlalchemy.orm import DeclarativeBase
 from werkzeug.middleware.proxy_fix import ProxyFix
 from extensions import db
 
-class Base(DeclarativeBase):
-    pass
+def _is_flask_cli_task():
+    """True for `flask <command>` invocations other than `flask run`, which serve no traffic"""
+    if not sys.argv:
+        return False
+    program = sys.argv[0]
+    is_flask_cli = os.path.basename(program) in ("flask", "flask.exe") or program.endswith(
+        os.path.join("flask", "__main__.py")
+    )
+    return is_flask_cli and "run" not in sys.argv[1:]
 
 def create_app():
     app = Flask(__name__)
     app.secret_key = os.environ.get("SESSION_SECRET", "dev-secret-key-change-in-production")
-    app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
+    # One trusted proxy hop (Render) sets X-Forwarded-For, so remote_addr is the client IP
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1, x_proto=1, x_host=1)
 
     app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get("DATABASE_URL", "sqlite:///app.db")
     app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
         "pool_recycle": 300,
         "pool_pre_ping": True,
     }
+    # LAZY_STARTUP=1 skips the boot warmup so models load on first use. Unset, it is on
+    # for `flask` CLI tasks and off for web workers (gunicorn, `flask run`, python app.py)
+    lazy_startup = os.environ.get("LAZY_STARTUP")
+    app.config["LAZY_STARTUP"] = lazy_startup == "1" if lazy_startup is not None else _is_flask_cli_task()
+    # RUN_MIGRATIONS=1 upgrades the schema at boot; otherwise use `flask init-db`
+    app.config["RUN_MIGRATIONS"] = os.environ.get("RUN_MIGRATIONS", "0") == "1"
 
     db.init_app(app)
-    
+
     with app.app_context():
         import models
         from routes import routes_bp
         app.register_blueprint(routes_bp)
-        db.create_all()
+        if app.config["RUN_MIGRATIONS"]:
+            models.upgrade_schema()
+
+    from commands import register_commands
+    register_commands(app)
+
+    # Warm the model, question sets and templates before taking traffic
+    if not app.config["LAZY_STARTUP"]:
+        from health_service import run_warmup
+        run_warmup(app)
 
     return app
 
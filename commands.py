@@ -0,0 +1,93 @@
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+
+import click
+
+
+# Matches lines of `python -X importtime` output: "import time: self | cumulative | name"
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def profile_imports(target: str = "app", lazy: bool = True):
+    """Import target in a fresh interpreter under -X importtime and parse the report.
+
+    Returns the per-module rows as (self_us, cumulative_us, depth, module) and
+    the wall time of the import in seconds.
+    """
+    env = dict(os.environ)
+    env["LAZY_STARTUP"] = "1" if lazy else "0"
+    command = [
+        sys.executable, "-X", "importtime", "-c",
+        f"import time; t = time.perf_counter(); import {target}; print(time.perf_counter() - t)",
+    ]
+    result = subprocess.run(command, capture_output=True, text=True, env=env)
+    if result.returncode != 0:
+        raise click.ClickException(f"Importing {target} failed:\n{result.stderr[-2000:]}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append((int(self_us), int(cumulative_us), (len(indent) - 1) // 2, module))
+    return rows, float(result.stdout.strip().splitlines()[-1])
+
+
+def register_commands(app):
+    """Attach the maintenance CLI commands. Heavy modules are imported inside each command."""
+
+    @app.cli.command("init-db")
+    def init_db_command():
+        """Create any missing database tables and columns."""
+        from models import upgrade_schema
+
+        upgrade_schema()
+        click.echo("Database schema is up to date")
+
+    @app.cli.command("export-data")
+    @click.option("--out", "directory", default="exports", show_default=True, help="Export directory")
+    @click.option("--responses", "responses_file", default="responses.json", show_default=True)
+    @click.option("--chunk-size", default=5000, show_default=True, type=int)
+    @click.option("--format", "file_format", default="auto", show_default=True,
+                  type=click.Choice(["auto", "parquet", "npz"]))
+    def export_data_command(directory, responses_file, chunk_size, file_format):
+        """Export new predictions and test results in a compact columnar format."""
+        from export_service import export_data
+
+        summary = export_data(directory, responses_file, chunk_size, file_format)
+        click.echo(
+            f"Exported {summary['emotion_entries']} emotion entries and "
+            f"{summary['test_results']} test results as {summary['format']}"
+        )
+        for path in summary["files"]:
+            click.echo(f"  {path}")
+
+    @app.cli.command("import-profile")
+    @click.option("--target", default="app", show_default=True, help="Module to import")
+    @click.option("--lazy/--eager", default=False, show_default=True,
+                  help="Profile with LAZY_STARTUP on or off")
+    @click.option("--top", default=15, show_default=True, type=int, help="Rows to show per table")
+    def import_profile_command(target, lazy, top):
+        """Report where import and startup time goes, like `python -X importtime`."""
+        rows, wall_seconds = profile_imports(target, lazy)
+        if not rows:
+            raise click.ClickException("No import timings were reported")
+
+        by_package = defaultdict(int)
+        for self_us, cumulative_us, depth, module in rows:
+            by_package[module.split(".")[0]] += self_us
+
+        total_us = sum(self_us for self_us, _, _, _ in rows)
+        mode = "lazy" if lazy else "eager"
+        click.echo(f"import {target} ({mode}): {wall_seconds:.3f}s wall, {total_us / 1e6:.3f}s in module bodies\n")
+
+        click.echo("Top-level packages by total self time:")
+        for package, self_us in sorted(by_package.items(), key=lambda item: -item[1])[:top]:
+            click.echo(f"  {self_us / 1e3:10.1f} ms  {package}")
+
+        click.echo("\nSlowest modules by cumulative time:")
+        for self_us, cumulative_us, depth, module in sorted(rows, key=lambda row: -row[1])[:top]:
+            click.echo(f"  {cumulative_us / 1e3:10.1f} ms  (self {self_us / 1e3:8.1f} ms)  {module}")
@@ -0,0 +1,130 @@
+import json
+import logging
+import os
+from collections import deque
+from typing import Dict, List
+
+
+class CrisisKeywordMatcher:
+    """Aho-Corasick matcher over the curated crisis lexicon.
+
+    The automaton is compiled once at load time, so every scan is a single
+    linear pass over the text regardless of how many phrases are listed.
+    """
+
+    def __init__(self, lexicon_file: str = "crisis-lexicon.json"):
+        self.lexicon_file = lexicon_file
+        self.phrases = []
+        # Flat automaton tables, indexed by state id
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+        self.load_lexicon()
+
+    def load_lexicon(self):
+        if not os.path.exists(self.lexicon_file):
+            logging.error(f"Crisis lexicon not found: {self.lexicon_file}")
+            return
+        try:
+            with open(self.lexicon_file, "r") as f:
+                data = json.load(f)
+            phrases = {self._normalize(p) for p in data.get("crisis_phrases", [])}
+            self.phrases = sorted(p for p in phrases if p)
+            self._build()
+            logging.info(f"Crisis lexicon loaded with {len(self.phrases)} phrases")
+        except Exception as e:
+            logging.error(f"Error loading crisis lexicon: {e}")
+            self.phrases = []
+            self._goto, self._fail, self._output = [{}], [0], [[]]
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        return " ".join(text.replace("’", "'").lower().split())
+
+    def _build(self):
+        goto, fail, output = [{}], [0], [[]]
+
+        for phrase_index, phrase in enumerate(self.phrases):
+            state = 0
+            for char in phrase:
+                next_state = goto[state].get(char)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][char] = next_state
+                    goto.append({})
+                    fail.append(0)
+                    output.append([])
+                state = next_state
+            output[state].append(phrase_index)
+
+        # Breadth-first pass to fill in failure links
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in goto[state].items():
+                queue.append(next_state)
+                fallback = fail[state]
+                while fallback and char not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[next_state] = goto[fallback].get(char, 0)
+                output[next_state] = output[next_state] + output[fail[next_state]]
+
+        self._goto, self._fail, self._output = goto, fail, output
+
+    def find_matches(self, text: str) -> List[str]:
+        """Return the lexicon phrases found in text, matched on word boundaries."""
+        if not text or not self.phrases:
+            return []
+
+        text = self._normalize(text)
+        goto, fail, output, phrases = self._goto, self._fail, self._output, self.phrases
+        found = set()
+        state = 0
+
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for phrase_index in output[state]:
+                start = position - len(phrases[phrase_index]) + 1
+                end = position + 1
+                if (start == 0 or not text[start - 1].isalnum()) and (end == len(text) or not text[end].isalnum()):
+                    found.add(phrases[phrase_index])
+
+        return sorted(found)
+
+    def is_crisis(self, text: str) -> bool:
+        return bool(self.find_matches(text))
+
+
+# Global matcher instance
+crisis_matcher = CrisisKeywordMatcher()
+
+
+def _benchmark(repeat: int = 2000):
+    """Compare the automaton against a single alternation regex over the same lexicon."""
+    import re
+    import timeit
+
+    pattern = re.compile(
+        r"(?<!\w)(?:" + "|".join(re.escape(p) for p in sorted(crisis_matcher.phrases, key=len, reverse=True)) + r")(?!\w)"
+    )
+    samples = {
+        "short": "I had a long day at work and I just feel tired and a bit flat tonight.",
+        "crisis": "Lately everything feels pointless and honestly I want to die, nobody would notice.",
+        "long": " ".join(["I keep going through the motions at school and at home."] * 40),
+    }
+
+    for name, sample in samples.items():
+        normalized = crisis_matcher._normalize(sample)
+        automaton_time = timeit.timeit(lambda: crisis_matcher.find_matches(sample), number=repeat)
+        regex_time = timeit.timeit(lambda: set(pattern.findall(normalized)), number=repeat)
+        print(
+            f"{name:>7} ({len(sample)} chars): "
+            f"aho-corasick {automaton_time / repeat * 1e6:8.1f} us/call, "
+            f"regex {regex_time / repeat * 1e6:8.1f} us/call"
+        )
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -0,0 +1,274 @@
+import json
+import logging
+import os
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List
+
+import click
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet is optional, fall back to NumPy .npz parts
+    pa = None
+    pq = None
+
+from extensions import db
+from models import EmotionEntry
+from responses_reader import iter_response_records
+
+DEFAULT_EXPORT_DIR = "exports"
+DEFAULT_CHUNK_SIZE = 5000
+WATERMARK_FILE = ".watermark.json"
+
+EMOTION_COLUMNS = {
+    "id": "int64",
+    "user_id": "int64",
+    "created_at": "datetime",
+    "prediction_label": "category",
+    "prediction_confidence": "float32",
+    "model_version": "category",
+}
+TEST_RESULT_COLUMNS = {
+    "offset": "int64",
+    "timestamp": "datetime",
+    "test_type": "category",
+    "severity": "category",
+    "total_score": "int16",
+    "total_questions": "int16",
+    "yes_count": "int16",
+    "no_count": "int16",
+    "prefer_not_count": "int16",
+    "percentage_positive": "float32",
+}
+
+
+class ChunkWriter:
+    """Writes each row chunk for one source as its own numbered part file:
+    Parquet when pyarrow is installed, NumPy .npz otherwise.
+
+    Every part is complete on disk once write() returns, so the export
+    watermark can be advanced chunk by chunk. Category columns are
+    dictionary-encoded. The .npz dictionary is shared across the parts of
+    a run, so codes stay comparable between parts.
+    """
+
+    def __init__(self, directory: str, name: str, columns: Dict[str, str], file_format: str):
+        self.directory = directory
+        self.name = name
+        self.columns = columns
+        self.file_format = file_format
+        self.run_stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+        self.dictionaries = {column: {} for column, kind in columns.items() if kind == "category"}
+        self.parts = 0
+        self.rows = 0
+        self.paths = []
+        os.makedirs(directory, exist_ok=True)
+
+    def _encode(self, column: str, values: List) -> np.ndarray:
+        dictionary = self.dictionaries[column]
+        codes = np.empty(len(values), dtype=np.int32)
+        for i, value in enumerate(values):
+            if value is None:
+                codes[i] = -1
+                continue
+            code = dictionary.get(value)
+            if code is None:
+                code = dictionary[value] = len(dictionary)
+            codes[i] = code
+        return codes
+
+    @staticmethod
+    def _to_array(kind: str, values: List) -> np.ndarray:
+        if kind == "datetime":
+            return np.array([v if v is not None else "NaT" for v in values], dtype="datetime64[us]")
+        if kind.startswith("float"):
+            return np.array([v if v is not None else np.nan for v in values], dtype=kind)
+        return np.array([v if v is not None else -1 for v in values], dtype=kind)
+
+    def write(self, rows: Dict[str, List]):
+        count = len(next(iter(rows.values())))
+        if not count:
+            return
+        if self.file_format == "parquet":
+            self._write_parquet(rows)
+        else:
+            self._write_npz(rows)
+        self.parts += 1
+        self.rows += count
+
+    def _part_path(self, extension: str) -> str:
+        return os.path.join(self.directory, f"{self.name}-{self.run_stamp}-part{self.parts + 1:04d}.{extension}")
+
+    @staticmethod
+    @contextmanager
+    def _atomic(path: str):
+        """Write to a temporary file and move it into place only once it is complete"""
+        tmp_path = f"{path}.tmp"
+        try:
+            yield tmp_path
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _write_npz(self, rows: Dict[str, List]):
+        arrays = {}
+        for column, kind in self.columns.items():
+            if kind == "category":
+                arrays[column] = self._encode(column, rows[column])
+                dictionary = self.dictionaries[column]
+                arrays[f"{column}__dictionary"] = np.array(list(dictionary), dtype=np.str_)
+            else:
+                arrays[column] = self._to_array(kind, rows[column])
+        path = self._part_path("npz")
+        with self._atomic(path) as tmp_path, open(tmp_path, "wb") as f:
+            np.savez_compressed(f, **arrays)
+        self.paths.append(path)
+
+    def _write_parquet(self, rows: Dict[str, List]):
+        arrays = []
+        for column, kind in self.columns.items():
+            if kind == "category":
+                arrays.append(pa.array(rows[column], type=pa.string()).dictionary_encode())
+            elif kind == "datetime":
+                arrays.append(pa.array(rows[column], type=pa.timestamp("us")))
+            else:
+                arrays.append(pa.array(rows[column], type=getattr(pa, kind)()))
+        table = pa.Table.from_arrays(arrays, names=list(self.columns))
+        path = self._part_path("parquet")
+        with self._atomic(path) as tmp_path:
+            pq.write_table(table, tmp_path, compression="zstd")
+        self.paths.append(path)
+
+
+def load_watermark(directory: str) -> Dict:
+    path = os.path.join(directory, WATERMARK_FILE)
+    if not os.path.exists(path):
+        return {"emotion_entry_id": 0, "responses_offset": 0}
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def save_watermark(directory: str, watermark: Dict):
+    path = os.path.join(directory, WATERMARK_FILE)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(watermark, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def iter_emotion_chunks(after_id: int, chunk_size: int) -> Iterator[Dict[str, List]]:
+    """Page through EmotionEntry by primary key, never loading the whole table."""
+    last_id = after_id
+    while True:
+        rows = (
+            db.session.query(
+                EmotionEntry.id,
+                EmotionEntry.user_id,
+                EmotionEntry.created_at,
+                EmotionEntry.prediction_label,
+                EmotionEntry.prediction_confidence,
+                EmotionEntry.model_version,
+            )
+            .filter(EmotionEntry.id > last_id)
+            .order_by(EmotionEntry.id)
+            .limit(chunk_size)
+            .all()
+        )
+        if not rows:
+            return
+        columns = {column: [] for column in EMOTION_COLUMNS}
+        for row in rows:
+            for column in EMOTION_COLUMNS:
+                columns[column].append(getattr(row, column))
+        last_id = rows[-1].id
+        yield columns
+
+
+def _parse_timestamp(value, offset: int):
+    """Parse an ISO timestamp, recording a malformed one as missing instead of failing the export"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value))
+    except ValueError:
+        logging.warning(f"Malformed timestamp {value!r} in responses record at byte {offset}")
+        return None
+
+
+def _parse_number(value, kind):
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        return kind(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def iter_test_result_chunks(path: str, start_offset: int, chunk_size: int, progress: Dict) -> Iterator[Dict[str, List]]:
+    """Flatten responses.json records into test-result rows, chunk_size at a time.
+
+    ``progress["responses_offset"]`` is advanced to the end of the last record
+    included in each yielded chunk.
+    """
+    columns = {column: [] for column in TEST_RESULT_COLUMNS}
+    for start, end, record in iter_response_records(path, start_offset):
+        progress["responses_offset"] = end
+        if not isinstance(record, dict):
+            continue
+        analysis = record.get("analysis")
+        if not isinstance(analysis, dict):
+            analysis = {}
+        columns["offset"].append(start)
+        columns["timestamp"].append(_parse_timestamp(record.get("timestamp") or analysis.get("timestamp"), start))
+        columns["test_type"].append(str(record.get("test_type") or analysis.get("test_type") or "unknown"))
+        severity = analysis.get("severity")
+        columns["severity"].append(str(severity) if severity is not None else None)
+        for column in ("total_score", "total_questions", "yes_count", "no_count", "prefer_not_count"):
+            columns[column].append(_parse_number(analysis.get(column), int))
+        columns["percentage_positive"].append(_parse_number(analysis.get("percentage_positive"), float))
+
+        if len(columns["offset"]) >= chunk_size:
+            yield columns
+            columns = {column: [] for column in TEST_RESULT_COLUMNS}
+    if columns["offset"]:
+        yield columns
+
+
+def export_data(directory: str = DEFAULT_EXPORT_DIR, responses_file: str = "responses.json",
+                chunk_size: int = DEFAULT_CHUNK_SIZE, file_format: str = "auto") -> Dict:
+    """Incrementally export predictions and test results since the last watermark."""
+    if file_format == "auto":
+        file_format = "parquet" if pq is not None else "npz"
+    if file_format == "parquet" and pq is None:
+        raise click.ClickException("Parquet export requires pyarrow; use --format npz")
+
+    watermark = load_watermark(directory)
+    summary = {"format": file_format, "files": []}
+
+    # The watermark is saved after every part, so a failed run resumes after the last complete part
+    writer = ChunkWriter(directory, "emotion_entries", EMOTION_COLUMNS, file_format)
+    for chunk in iter_emotion_chunks(watermark["emotion_entry_id"], chunk_size):
+        writer.write(chunk)
+        watermark["emotion_entry_id"] = chunk["id"][-1]
+        save_watermark(directory, watermark)
+    summary["emotion_entries"] = writer.rows
+    summary["files"] += writer.paths
+
+    writer = ChunkWriter(directory, "test_results", TEST_RESULT_COLUMNS, file_format)
+    progress = {"responses_offset": watermark["responses_offset"]}
+    if os.path.exists(responses_file):
+        for chunk in iter_test_result_chunks(responses_file, watermark["responses_offset"], chunk_size, progress):
+            writer.write(chunk)
+            watermark["responses_offset"] = progress["responses_offset"]
+            save_watermark(directory, watermark)
+    summary["test_results"] = writer.rows
+    summary["files"] += writer.paths
+
+    watermark["exported_at"] = datetime.utcnow().isoformat()
+    save_watermark(directory, watermark)
+    return summary
+
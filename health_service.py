@@ -0,0 +1,170 @@
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Dict
+
+from flask import render_template
+
+from ml_service import predictor
+from mental_test_dep_service import get_formatted_questions
+from models import missing_added_columns
+
+# Long enough to clear MIN_TEXT_LENGTH and free of crisis-lexicon phrases
+WARMUP_TEXT = (
+    "Today was a fairly ordinary day. I went to work, had lunch with a friend, "
+    "went for a short walk in the evening and read a few chapters of my book."
+)
+WARMUP_TEMPLATES = ("index.html", "mental_test.html", "resources.html", "contact.html")
+# Minimum gap between warmup attempts after one finished with errors
+WARMUP_RETRY_SECONDS = 30
+
+_boot_started = time.perf_counter()
+
+warmup_state = {
+    "complete": False,
+    "started_at": None,
+    "finished_at": None,
+    "timings": {},
+    "errors": [],
+}
+# Serializes warmups; warmup_state is only written while it is held
+_warmup_lock = threading.Lock()
+_last_attempt = None
+_schema_current = False
+
+
+def run_warmup(app) -> Dict:
+    """Pay first-call costs at boot instead of on the first real user request.
+
+    Runs a synthetic prediction (vectorizer, model and NumPy dispatch), fetches
+    a question set for each test and renders every page template so Jinja has
+    them compiled and cached. Nothing is written to the database.
+    Concurrent callers wait for the running warmup instead of starting another.
+    """
+    with _warmup_lock:
+        if warmup_state["complete"] and not warmup_state["errors"]:
+            return dict(warmup_state)
+        return _run_warmup_locked(app)
+
+
+def ensure_warm(app) -> None:
+    """Run warmup from a request if it has not succeeded yet.
+
+    Never blocks. If a warmup is already running, or the last failed attempt
+    was less than WARMUP_RETRY_SECONDS ago, this returns without doing anything.
+    """
+    if warmup_state["complete"] and not warmup_state["errors"]:
+        return
+    if _last_attempt is not None and time.monotonic() - _last_attempt < WARMUP_RETRY_SECONDS:
+        return
+    if not _warmup_lock.acquire(blocking=False):
+        return
+    try:
+        if not (warmup_state["complete"] and not warmup_state["errors"]):
+            _run_warmup_locked(app)
+    finally:
+        _warmup_lock.release()
+
+
+def _run_warmup_locked(app) -> Dict:
+    global _last_attempt
+    _last_attempt = time.monotonic()
+    timings = {}
+    errors = []
+    started_at = datetime.utcnow().isoformat()
+
+    started = time.perf_counter()
+    try:
+        # A failed earlier load is retried rather than cached
+        predictor.ensure_models_loaded(retry=True)
+        result = predictor.predict_mental_health(WARMUP_TEXT, explain=True, seed=0)
+        if result.get("status") != "success":
+            errors.append(f"prediction: {result.get('message', 'model unavailable')}")
+    except Exception as e:
+        errors.append(f"prediction: {e}")
+    timings["prediction_seconds"] = round(time.perf_counter() - started, 4)
+
+    started = time.perf_counter()
+    for test_type in ("depression", "anxiety", "stress"):
+        try:
+            if not get_formatted_questions(test_type, 5):
+                errors.append(f"questions: no {test_type} questions loaded")
+        except Exception as e:
+            errors.append(f"questions: {test_type}: {e}")
+    timings["questions_seconds"] = round(time.perf_counter() - started, 4)
+
+    started = time.perf_counter()
+    with app.test_request_context("/"):
+        for template in WARMUP_TEMPLATES:
+            try:
+                render_template(template)
+            except Exception as e:
+                errors.append(f"template: {template}: {e}")
+    timings["templates_seconds"] = round(time.perf_counter() - started, 4)
+
+    warmup_state.update({
+        "complete": True,
+        "started_at": started_at,
+        "finished_at": datetime.utcnow().isoformat(),
+        "timings": timings,
+        "errors": errors,
+    })
+
+    if errors:
+        logging.warning(f"Warmup finished with errors, will retry: {errors}")
+    else:
+        logging.info(f"Warmup finished: {timings}")
+    return dict(warmup_state)
+
+
+def _timings(state: Dict) -> Dict:
+    return {
+        "model_load_seconds": round(predictor.load_seconds, 4) if predictor.load_seconds is not None else None,
+        "uptime_seconds": round(time.perf_counter() - _boot_started, 2),
+        **state["timings"],
+    }
+
+
+def health_report() -> Dict:
+    """Liveness: the process is up and serving."""
+    return {"status": "ok", "timings": _timings(dict(warmup_state))}
+
+
+def _schema_errors():
+    """Missing schema columns; once the schema is current the result is cached."""
+    global _schema_current
+    if _schema_current:
+        return []
+    try:
+        missing = missing_added_columns()
+    except Exception as e:
+        return [f"schema: {e}"]
+    if missing:
+        return [f"schema: missing {', '.join(missing)}; run `flask --app app init-db`"]
+    _schema_current = True
+    return []
+
+
+def readiness_report() -> Dict:
+    """Readiness: schema is current, models and response content are loaded and warmup has completed without errors.
+
+    Must be called inside an application context.
+    """
+    state = dict(warmup_state)
+    schema_errors = _schema_errors()
+    checks = {
+        "schema_current": not schema_errors,
+        "models_loaded": predictor.is_loaded,
+        "content_loaded": predictor.content_loaded,
+        "warmup_complete": state["complete"],
+        "warmup_ok": state["complete"] and not state["errors"],
+    }
+    content_errors = [] if checks["content_loaded"] else ["content: prediction-content.json not loaded, serving built-in crisis content only"]
+    return {
+        "ready": all(checks.values()),
+        "checks": checks,
+        "errors": schema_errors + content_errors + state["errors"],
+        "warmed_up_at": state["finished_at"],
+        "timings": _timings(state),
+    }
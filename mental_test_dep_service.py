@@ -14,7 +14,15 @@ class MentalTestPredictor:
         self.questions_file = self.get_questions_file()
         self.questions = {}
         self.options = {}
-        self.load_questions()
+        self.question_ids = ()
+        self.all_questions_mask = 0
+        self.loaded = False
+
+    def ensure_loaded(self):
+        """Read the questions file on first use instead of at import time"""
+        if not self.loaded:
+            self.load_questions()
+            self.loaded = True
 
     def get_questions_file(self) -> str:
         if self.test_type == "depression":
@@ -38,15 +46,59 @@ class MentalTestPredictor:
             key_options = f"{self.test_type}_options"
             self.questions = {int(k): v for k, v in data[key_questions].items()}
             self.options = {int(k): v for k, v in data[key_options].items()}
+            self.question_ids = tuple(sorted(self.questions))
+            # Question ids double as bit positions in per-user seen-question masks
+            self.all_questions_mask = sum(1 << q_id for q_id in self.question_ids)
             logging.info(f"{self.test_type.capitalize()} questions loaded successfully")
         except Exception as e:
             logging.error(f"Error loading {self.test_type} questions: {e}")
 
-    def get_random_questions(self, count: int = 20) -> Dict[int, str]:
+    def get_random_questions(self, count: int = 20, seen_mask: int = 0) -> Dict[int, str]:
+        """Sample questions, preferring ones not set in the user's seen_mask bitset."""
+        self.ensure_loaded()
+        if count <= 0:
+            return {}
         if count > len(self.questions):
             logging.warning("Requested count exceeds available questions, returning all questions")
             return self.questions
-        return dict(random.sample(list(self.questions.items()), count))
+
+        seen_mask &= self.all_questions_mask
+        unseen_count = len(self.question_ids) - seen_mask.bit_count()
+        if not seen_mask:
+            picked = random.sample(self.question_ids, count)
+        elif unseen_count >= 2 * count and unseen_count * 2 >= len(self.question_ids):
+            # At least half the questions unseen and count of them still unseen after picking,
+            # so each draw is accepted with probability >= 1/4: at most 4 * count expected draws
+            picked = []
+            chosen = 0
+            while len(picked) < count:
+                q_id = random.choice(self.question_ids)
+                if not (seen_mask | chosen) >> q_id & 1:
+                    chosen |= 1 << q_id
+                    picked.append(q_id)
+        else:
+            # O(len(questions)) scan of the mask
+            unseen = [q_id for q_id in self.question_ids if not seen_mask >> q_id & 1]
+            if unseen_count >= count:
+                picked = random.sample(unseen, count)
+            else:
+                # Show everything unseen, then top up with random repeats
+                seen = [q_id for q_id in self.question_ids if seen_mask >> q_id & 1]
+                picked = unseen + random.sample(seen, count - unseen_count)
+
+        return {q_id: self.questions[q_id] for q_id in picked}
+
+    def mark_seen(self, seen_mask: int, question_ids: List[int]) -> int:
+        """Add answered question ids to a seen mask, starting over once every question is seen."""
+        self.ensure_loaded()
+        answered = 0
+        for q_id in question_ids:
+            if q_id in self.questions:
+                answered |= 1 << q_id
+        seen_mask = (seen_mask | answered) & self.all_questions_mask
+        if seen_mask == self.all_questions_mask:
+            seen_mask = answered
+        return seen_mask
 
     def compute_score(self, answers: List[Dict]) -> Dict:
         total_score = 0
@@ -129,14 +181,17 @@ class MentalTestPredictor:
             logging.error(f"Error saving responses: {e}")
 
 
-# Create global instances for each test
+# Create global instances for each test (questions are read on first use)
 depression_predictor = MentalTestPredictor("depression")
 anxiety_predictor = MentalTestPredictor("anxiety")
 stress_predictor = MentalTestPredictor("stress")
 
 
-def get_formatted_questions(test_type: str = "depression", count: int = 20) -> List[Dict]:
-    """Get a random subset of questions formatted with options for frontend."""
+def get_formatted_questions(test_type: str = "depression", count: int = 20, seen_mask: int = 0) -> List[Dict]:
+    """Get a random subset of questions formatted with options for frontend.
+
+    Questions not set in ``seen_mask`` are served first.
+    """
     try:
         if test_type.lower() == "depression":
             predictor = depression_predictor
@@ -148,7 +203,7 @@ def get_formatted_questions(test_type: str = "depression", count: int = 20) -> L
             logging.error(f"Unknown test type: {test_type}")
             return []
 
-        random_questions = predictor.get_random_questions(count)
+        random_questions = predictor.get_random_questions(count, seen_mask)
         formatted_questions = []
         for q_id, question_text in random_questions.items():
             options = [
@@ -213,6 +268,7 @@ def get_test_statistics(test_type: str = "depression") -> Dict:
         else:
             return {"error": f"Unknown test type: {test_type}"}
         
+        predictor.ensure_loaded()
         return {
             "test_type": test_type,
             "total_questions": len(predictor.questions),
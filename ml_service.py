@@ -1,40 +1,162 @@
-import joblib
+import json
 import logging
 import os
-from typing import Dict
+from types import MappingProxyType
+from typing import Dict, List, Mapping, NamedTuple, Tuple
 import random
+import threading
+import time
+from crisis_service import crisis_matcher
+
+# Shared minimum input length for the emotion form and the model
+MIN_TEXT_LENGTH = 50
+CRISIS_LABEL = "suicidal ideation"
+MODEL_VERSION = "improved_v1"
+# Recorded instead of MODEL_VERSION when only the crisis lexicon, not the model, produced the label
+CRISIS_LEXICON_VERSION = "crisis_lexicon"
+
+
+class ResponseContent(NamedTuple):
+    """Pre-built message, recommendation and resource options for one label"""
+    analysis: Tuple[str, ...]
+    recommendations: Tuple[Tuple[str, ...], ...]
+    resources: Tuple[Mapping[str, str], ...]
+
+
+# Built-in crisis content, used when prediction-content.json is missing, malformed or
+# has no resources for CRISIS_LABEL, so crisis users always get somewhere to turn
+CRISIS_FALLBACK_CONTENT = ResponseContent(
+    analysis=(
+        "Your life is precious and you are not alone. Please reach out to someone you trust or a crisis line.",
+    ),
+    recommendations=(
+        (
+            "Please reach out immediately to a trusted friend or family member.",
+            "Contact a crisis helpline for immediate support.",
+        ),
+    ),
+    resources=(
+        MappingProxyType({"name": "Our Side of Suicide", "url": "https://www.oursideofsuicide.com/"}),
+        MappingProxyType({"name": "Speaking of Suicide", "url": "https://speakingofsuicide.com/"}),
+    ),
+)
+
+
+def load_response_content(content_file: str = 'prediction-content.json'):
+    """Load the label-to-content table once into immutable, label-indexed tuples.
+
+    CRISIS_LABEL falls back to CRISIS_FALLBACK_CONTENT when the file does not provide resources for it.
+    """
+    def build(entry: Dict) -> ResponseContent:
+        return ResponseContent(
+            analysis=tuple(entry.get('analysis', ())),
+            recommendations=tuple(tuple(options) for options in entry.get('recommendations', ()) if options),
+            resources=tuple(MappingProxyType(dict(resource)) for resource in entry.get('resources', ())),
+        )
+
+    try:
+        with open(content_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        labels = {label.strip().lower(): build(entry) for label, entry in data.get('labels', {}).items()}
+        crisis_content = labels.get(CRISIS_LABEL)
+        if crisis_content is None or not crisis_content.resources:
+            logging.error(f"No {CRISIS_LABEL} resources in {content_file}, using built-in crisis content")
+            labels[CRISIS_LABEL] = CRISIS_FALLBACK_CONTENT
+        return MappingProxyType(labels), build(data['default'])
+    except Exception as e:
+        logging.error(f"Error loading response content from {content_file}: {e}")
+        return MappingProxyType({CRISIS_LABEL: CRISIS_FALLBACK_CONTENT}), ResponseContent(
+            analysis=("Thank you for sharing. If you need support, please reach out to a professional or someone you trust.",),
+            recommendations=(),
+            resources=(),
+        )
+
 
 class MentalHealthPredictor:
     def __init__(self):
         self.model = None
         self.vectorizer = None
-        self.load_models()
+        self.feature_names = None
+        self.load_seconds = None
+        self.models_attempted = False
+        self._load_lock = threading.Lock()
+        self.content, self.default_content = load_response_content()
+
+    def ensure_models_loaded(self, retry: bool = False):
+        """Load the models on first use so importing this module stays cheap.
+
+        With ``retry=True`` a previous failed load is attempted again.
+        """
+        if self.models_attempted and (self.is_loaded or not retry):
+            return
+        with self._load_lock:
+            if not self.models_attempted or (retry and not self.is_loaded):
+                self.load_models()
+                self.models_attempted = True
     
     def load_models(self):
         """Load the pre-trained model and vectorizer"""
+        started = time.perf_counter()
         try:
+            import joblib
+
             model_path = 'mental_health_model.joblib'
             vectorizer_path = 'tfidf_vectorizer.joblib'
             
             if os.path.exists(model_path) and os.path.exists(vectorizer_path):
                 self.model = joblib.load(model_path)
                 self.vectorizer = joblib.load(vectorizer_path)
-                logging.info("ML models loaded successfully")
+                self.feature_names = self._build_feature_names()
+                self.load_seconds = time.perf_counter() - started
+                logging.info(f"ML models loaded successfully in {self.load_seconds:.2f}s")
             else:
                 logging.warning("ML model files not found, using fallback prediction")
         except Exception as e:
             logging.error(f"Error loading ML models: {e}")
             self.model = None
             self.vectorizer = None
+            self.feature_names = None
+
+    @property
+    def content_loaded(self) -> bool:
+        """False when prediction-content.json could not be read and only built-in content is available"""
+        return any(content is not CRISIS_FALLBACK_CONTENT for content in self.content.values())
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.model is not None and self.vectorizer is not None
+
+    def _build_feature_names(self):
+        """Invert the vectorizer vocabulary once so column indices map straight to terms"""
+        import numpy as np
+
+        vocabulary = getattr(self.vectorizer, 'vocabulary_', None)
+        if not vocabulary:
+            return None
+        feature_names = np.empty(len(vocabulary), dtype=object)
+        for term, index in vocabulary.items():
+            feature_names[index] = term
+        return feature_names
     
-    def predict_mental_health(self, text: str) -> Dict:
-        """Predict mental health status from text input"""
-        min_length = 100
-        if not text or len(text.strip()) < min_length:
+    def predict_mental_health(self, text: str, explain: bool = False, top_k: int = 5, seed=None) -> Dict:
+        """Predict mental health status from text input.
+
+        Pass ``explain=True`` to include the ``top_k`` terms that pushed the
+        prediction towards the predicted class, and ``seed`` to make the
+        message/recommendation/resource selection reproducible.
+        """
+        rng = random.Random(seed) if seed is not None else random
+        # Crisis prefilter runs before any gate so urgent texts are never dropped
+        crisis_terms = crisis_matcher.find_matches(text)
+
+        if not text or len(text.strip()) < MIN_TEXT_LENGTH:
+            if crisis_terms:
+                return self._crisis_result(crisis_terms, rng)
             return {
                 'status': 'error',
             }
         try:
+            self.ensure_models_loaded()
             if self.model is not None and self.vectorizer is not None:
                 text_vectorized = self.vectorizer.transform([text])
                 prediction = self.model.predict(text_vectorized)[0]
@@ -45,25 +167,90 @@ class MentalHealthPredictor:
                 else:
                     confidence = 80.0  # fallback default
                 
-                return self._format_prediction_result(prediction, confidence)
+                result = self._format_prediction_result(prediction, confidence, rng)
+                if explain:
+                    result['explanation'] = self._explain_prediction(text_vectorized, prediction, top_k)
+                if crisis_terms:
+                    self._flag_crisis(result, crisis_terms, rng)
+                return result
             else:
-                return self._fallback_prediction(text)
+                return self._crisis_result(crisis_terms, rng) if crisis_terms else self._fallback_prediction(text)
         except Exception as e:
             logging.error(f"Error in prediction: {e}")
-            return self._fallback_prediction(text)
+            return self._crisis_result(crisis_terms, rng) if crisis_terms else self._fallback_prediction(text)
+
+    def _flag_crisis(self, result: Dict, crisis_terms: List[str], rng=random) -> Dict:
+        """Mark a result as high-risk and make sure crisis resources are shown"""
+        result['crisis'] = True
+        result['crisis_terms'] = crisis_terms
+        if not result.get('resources') or result.get('prediction') != CRISIS_LABEL:
+            result['resources'] = self._get_resources(CRISIS_LABEL, rng) + result.get('resources', [])
+        result['show_resources'] = True
+        return result
+
+    def _crisis_result(self, crisis_terms: List[str], rng=random) -> Dict:
+        """Result for a crisis-lexicon hit when the model cannot score the text"""
+        result = self._format_prediction_result(CRISIS_LABEL, 0.0, rng)
+        result['model_scored'] = False
+        result['model_version'] = CRISIS_LEXICON_VERSION
+        return self._flag_crisis(result, crisis_terms, rng)
     
-    def _format_prediction_result(self, prediction, confidence: float) -> Dict:
+    def _explain_prediction(self, text_vectorized, prediction, top_k: int = 5) -> List[Dict]:
+        """Top contributing terms for the predicted class.
+
+        Only the nonzero TF-IDF entries of the request vector are weighted by
+        the class coefficients, so no dense pass over the vocabulary is needed.
+        """
+        import numpy as np
+
+        coef = getattr(self.model, 'coef_', None)
+        if coef is None or self.feature_names is None or top_k <= 0:
+            return []
+        try:
+            row = text_vectorized.tocsr()[0]
+            if row.nnz == 0:
+                return []
+
+            classes = list(self.model.classes_)
+            class_index = classes.index(prediction)
+            if coef.shape[0] == 1:
+                # Binary models store a single row of weights for classes_[1]
+                class_weights = coef[0] if class_index == 1 else -coef[0]
+            else:
+                class_weights = coef[class_index]
+            if hasattr(class_weights, 'toarray'):
+                class_weights = class_weights.toarray().ravel()
+
+            contributions = row.data * np.asarray(class_weights)[row.indices]
+            k = min(top_k, contributions.size)
+            top = np.argpartition(-contributions, k - 1)[:k]
+            top = top[np.argsort(-contributions[top])]
+
+            return [
+                {
+                    'term': str(self.feature_names[row.indices[i]]),
+                    'weight': round(float(contributions[i]), 4),
+                }
+                for i in top
+                if contributions[i] > 0
+            ]
+        except Exception as e:
+            logging.error(f"Error explaining prediction: {e}")
+            return []
+
+    def _format_prediction_result(self, prediction, confidence: float, rng=random) -> Dict:
         """Format the prediction result with actual model label and compassionate analysis"""
         label = str(prediction).strip().lower()
+        resources = self._get_resources(label, rng)
         
         return {
             'status': 'success',
             'prediction': label,
             'confidence': round(confidence, 2),
-            'analysis': self._get_analysis_message(label),  
-            'recommendations': self._get_recommendations(label),
-            'resources': self._get_resources(label),
-            'show_resources': bool(self._get_resources(label)),
+            'analysis': self._get_analysis_message(label, rng),  
+            'recommendations': self._get_recommendations(label, rng),
+            'resources': resources,
+            'show_resources': bool(resources),
         }
     
     def _fallback_prediction(self, text: str) -> Dict:
@@ -73,208 +260,22 @@ class MentalHealthPredictor:
             'message': 'Model unavailable - please try again later'
         }
     
-    def _get_analysis_message(self, label: str) -> str:
-        """Generate a warm, compassionate message based on the predicted label"""
-        if label == "suicidal ideation":
-            return random.choice([
-                "I'm deeply concerned about what you're going through. Please know that you matter and your life has value.",
-                "Your life is precious and you are not alone. Please reach out to someone you trust or a crisis line.",
-                "I'm worried about you. Please contact a mental health professional or crisis helpline immediately."
-            ])
-        
-        elif label == "depression/sadness/loneliness/bipolar":
-            return random.choice([
-                "I hear the weight in your words—you are not alone. Be gentle with yourself.",
-                "These feelings are valid, and it takes courage to express them.",
-                "You’re going through a tough time, but support is always available."
-            ])
-        
-        elif label == "anxiety disorders":
-            return random.choice([
-                "I understand anxiety can feel overwhelming. Take one breath at a time.",
-                "You are not alone—grounding techniques may help you.",
-                "Your courage in acknowledging anxiety shows strength."
-            ])
-        
-        elif label == "personality/psychotic disorders":
-            return random.choice([
-                "Your experiences are valid. You deserve compassion and professional support.",
-                "What you’re experiencing matters—support can make a big difference.",
-                "Please consider connecting with a mental health professional."
-            ])
-        
-        elif label == "positive mood":
-            return random.choice([
-                "Your words radiate positivity—keep nurturing these feelings.",
-                "Beautiful energy! Celebrate the joy in your life.",
-                "Your positive spirit shines through—keep smiling."
-            ])
-        
-        elif label == "normal":
-            return random.choice([
-                "Thank you for sharing. Your emotions are valid.",
-                "Opening up takes courage—be kind to yourself today.",
-                "Your self-awareness is a strength. Take care of yourself."
-            ])
-        
-        else:
-            return "Thank you for sharing. If you need support, please reach out to a professional or someone you trust."
-
+    def _get_analysis_message(self, label: str, rng=random) -> str:
+        """Pick a warm, compassionate message for the predicted label"""
+        return rng.choice(self.content.get(label, self.default_content).analysis)
 
-    def _get_recommendations(self, label: str) -> list:
+    def _get_recommendations(self, label: str, rng=random) -> list:
         """Return personalized recommendations based on the label"""
+        content = self.content.get(label, self.default_content)
+        return [rng.choice(options) for options in content.recommendations]
 
-        if "positive" in label:
-            recs_1 = [
-                "Keep nurturing your positive mindset—it’s your strength.",
-                "Share your joy with others; kindness multiplies.",
-                "Write down what went well today and celebrate it."
-            ]
-            recs_2 = [
-                "Spend time in nature to refresh your mind.",
-                "Express gratitude by noting 3 good things daily.",
-                "Do something creative—paint, sing, or play guitar."
-            ]
-            return [random.choice(recs_1), random.choice(recs_2)]
-
-        elif "normal" in label:
-            recs_1 = [
-                "Maintain balance by taking short mindful breaks.",
-                "Stay connected with your hobbies and routines.",
-                "Reflect daily on what keeps you grounded."
-            ]
-            recs_2 = [
-                "Keep your sleep cycle consistent.",
-                "Stay hydrated and eat nourishing meals.",
-                "Enjoy light physical activity like walking."
-            ]
-            return [random.choice(recs_1), random.choice(recs_2)]
-
-        elif "anxiety" in label:
-            recs_1 = [
-                "Practice deep breathing or meditation daily.",
-                "Limit excessive screen or news time.",
-                "Talk about your feelings with a trusted friend."
-            ]
-            recs_2 = [
-                "Try grounding exercises—like naming 5 things around you.",
-                "Stretch your body to release built-up tension.",
-                "Make a calming evening routine before bed."
-            ]
-            return [random.choice(recs_1), random.choice(recs_2)]
-
-        elif any(word in label for word in ["depression", "sadness", "loneliness", "bipolar"]):
-            recs_1 = [
-                "Consider journaling to gently release emotions.",
-                "Reach out to someone you trust for connection.",
-                "Engage in a small, enjoyable activity each day."
-            ]
-            recs_2 = [
-                "Listen to uplifting or calming music.",
-                "Take short walks outside to reset your mood.",
-                "Remind yourself that healing is gradual, and that’s okay."
-            ]
-            return [random.choice(recs_1), random.choice(recs_2)]
-
-        elif any(word in label for word in ["personality", "psychotic"]):
-            recs_1 = [
-                "Stay consistent with your self-care routines.",
-                "Engage with support groups or therapy sessions.",
-                "Remind yourself you are not alone in this journey."
-            ]
-            recs_2 = [
-                "Keep a daily structure—it helps ground you.",
-                "Practice relaxation techniques before sleep.",
-                "Note small victories and give yourself credit."
-            ]
-            return [random.choice(recs_1), random.choice(recs_2)]
-
-        elif "suicidal" in label:
-            recs_1 = [
-                "Please reach out immediately to a trusted friend or family member.",
-                "Contact a crisis helpline for immediate support.",
-                "You are not alone—help is available right now."
-            ]
-            recs_2 = [
-                "Keep a list of supportive contacts nearby.",
-                "Avoid being alone—stay close to someone you trust.",
-                "Write down reasons to hold on when times are hard."
-            ]
-            return [random.choice(recs_1), random.choice(recs_2)]
-
-        else:
-            recs_1 = [
-                "Consider speaking with a mental health professional.",
-                "Reach out to crisis support services if needed.",
-                "Connect with trusted friends, family, or support groups."
-            ]
-            recs_2 = [
-                "Engage in light exercise or meditation.",
-                "Maintain healthy eating and sleeping patterns.",
-                "Stay open to new activities that bring joy."
-            ]
-            return [random.choice(recs_1), random.choice(recs_2)]
-
-    def _get_resources(self, label: str) -> list:
+    def _get_resources(self, label: str, rng=random) -> list:
         """Return crisis resources based on the label"""
-        resources = []
-
-        if "suicidal" in label:
-            available_resources = [
-                {
-                    "name": "Our Side of Suicide",
-                    "url": "https://www.oursideofsuicide.com/",
-                },
-                {   
-                    "name": "Suicide Prevention - Mayo Clinic",
-                    "url": "https://www.mayoclinic.org/diseases-conditions/suicide/symptoms-causes/syc-20378048",
-                },
-                {
-                    "name": "Speaking of Suicide",
-                    "url": "https://speakingofsuicide.com/",
-                }   
-            ]
-            resources.append(random.choice(available_resources))
-
-        elif any(word in label for word in ["personality", "psychotic"]):
-            available_resources = [
-                {
-                    "name": "Psychotic Disorder Blog - WebMD",
-                    "url": "https://www.webmd.com/schizophrenia/mental-health-psychotic-disorders",
-                },
-                {
-                    "name": "Personality Disorder Blog - MentalHealth",
-                    "url": "https://www.mentalhealth.com/library/personality-disorders",
-                }
-            ]
-            resources.append(random.choice(available_resources))
+        available_resources = self.content.get(label, self.default_content).resources
+        if not available_resources:
+            return []
+        return [dict(rng.choice(available_resources))]
 
-        elif any(word in label for word in ["depression", "sadness", "loneliness", "bipolar"]):
-            available_resources = [
-                {
-                    "name": "Postpartum Progress",
-                    "url": "https://postpartumprogress.com/",
-                },
-                {
-                    "name": "Top 10 Depression Blogs - Mind Diagnostics",
-                    "url": "https://www.mind-diagnostics.org/blog/depression/10-must-read-depression-blogs",
-                }
-            ]
-            resources.append(random.choice(available_resources))
-
-        elif "anxiety" in label:
-            available_resources = [
-                {
-                    "name": "The Anxiety Blog",
-                    "url": "http://theanxietyblog.com/",
-                },
-                {
-                    "name": "Choosing Therapy - Anxiety Blogs",
-                    "url": "https://www.choosingtherapy.com/anxiety-blogs/",
-                }
-            ]
-            resources.append(random.choice(available_resources))
 
-        return resources
 # Global predictor instance 
 predictor = MentalHealthPredictor()
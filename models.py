@@ -12,6 +12,8 @@ class User(UserMixin, db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     last_login = db.Column(db.DateTime, nullable=True)
     last_logout = db.Column(db.DateTime, nullable=True)
+    # JSON {test_type: bitmask} of answered question ids, so a new device continues where the last one stopped
+    seen_questions = db.Column(db.Text, nullable=True)
     entries = db.relationship("EmotionEntry", backref="user", lazy=True)
 
 class EmotionEntry(db.Model):
@@ -23,6 +25,52 @@ class EmotionEntry(db.Model):
     prediction_label = db.Column(db.String(100), nullable=True)
     prediction_confidence = db.Column(db.Float, nullable=True)
     model_version = db.Column(db.String(50), nullable=True)
+
+    # Crisis-lexicon prefilter hits, so flagged entries can be queried for review
+    crisis_flag = db.Column(db.Boolean, nullable=False, default=False, server_default=db.false(), index=True)
+    crisis_terms = db.Column(db.String(255), nullable=True)
     
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    ip_address = db.Column(db.String(45))
\ No newline at end of file
+    ip_address = db.Column(db.String(45))
+
+# Columns added after their table first shipped; create_all() does not add these
+# to existing tables, so upgrade_schema() adds them with plain ALTER TABLE.
+ADDED_COLUMNS = {
+    "user": {
+        "seen_questions": "TEXT",
+    },
+    "emotion_entry": {
+        "crisis_flag": "BOOLEAN NOT NULL DEFAULT FALSE",
+        "crisis_terms": "VARCHAR(255)",
+    },
+}
+
+
+def missing_added_columns():
+    """Return "table.column" for every ADDED_COLUMNS entry the database does not have yet."""
+    inspector = db.inspect(db.engine)
+    missing = []
+    for table, columns in ADDED_COLUMNS.items():
+        if not inspector.has_table(table):
+            missing.extend(f"{table}.{name}" for name in columns)
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table)}
+        missing.extend(f"{table}.{name}" for name in columns if name not in existing)
+    return missing
+
+
+def upgrade_schema():
+    """Create missing tables and add any missing ADDED_COLUMNS to existing ones."""
+    db.create_all()
+    inspector = db.inspect(db.engine)
+    quote = db.engine.dialect.identifier_preparer.quote
+    with db.engine.begin() as conn:
+        for table, columns in ADDED_COLUMNS.items():
+            existing = {column["name"] for column in inspector.get_columns(table)}
+            for name, ddl in columns.items():
+                if name not in existing:
+                    # quote() because "user" is a reserved word on PostgreSQL
+                    conn.execute(db.text(f"ALTER TABLE {quote(table)} ADD COLUMN {quote(name)} {ddl}"))
+        conn.execute(db.text(
+            "CREATE INDEX IF NOT EXISTS ix_emotion_entry_crisis_flag ON emotion_entry (crisis_flag)"
+        ))
@@ -0,0 +1,213 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Callable, Dict, Optional, Tuple
+
+from flask import flash, jsonify, render_template, request, session
+
+# "memory" keeps buckets per worker process, "sqlite" shares them across workers
+RATE_LIMIT_BACKEND = os.environ.get("RATE_LIMIT_BACKEND", "memory").lower()
+RATE_LIMIT_SQLITE_PATH = os.environ.get("RATE_LIMIT_SQLITE_PATH", "instance/rate_limits.db")
+
+# Requests allowed to be scoring at once in this process before new ones are shed
+MAX_INFLIGHT_REQUESTS = int(os.environ.get("MAX_INFLIGHT_REQUESTS", 8))
+
+
+class MemoryTokenBucket:
+    """Per-process token buckets.
+
+    Each key maps to an immutable (tokens, updated) tuple that is overwritten in
+    place, so a bucket is never missing while it is being updated and no lock is
+    taken on the request path. Concurrent requests for the same key can at worst
+    both spend the same token.
+
+    Updated keys are moved to the end of an OrderedDict, so its order is least
+    recently used first. Past ``max_keys`` the oldest ``evict_batch`` entries are
+    dropped; an evicted client simply starts again with a full bucket.
+    """
+
+    def __init__(self, max_keys: int = 10000, evict_batch: int = 256):
+        self.max_keys = max_keys
+        self.evict_batch = evict_batch
+        self._buckets: "OrderedDict[Tuple[str, str], Tuple[float, float]]" = OrderedDict()
+
+    def consume(self, name: str, key: str, capacity: int, refill_per_second: float) -> Tuple[bool, float]:
+        now = time.monotonic()
+        bucket_key = (name, key)
+        tokens, updated = self._buckets.get(bucket_key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * refill_per_second)
+
+        if tokens >= 1:
+            self._buckets[bucket_key] = (tokens - 1, now)
+            allowed, retry_after = True, 0.0
+        else:
+            self._buckets[bucket_key] = (tokens, now)
+            allowed, retry_after = False, (1 - tokens) / refill_per_second
+
+        try:
+            self._buckets.move_to_end(bucket_key)
+        except KeyError:
+            pass  # Evicted by another thread in the meantime
+        if len(self._buckets) > self.max_keys:
+            self._evict()
+        return allowed, retry_after
+
+    def _evict(self):
+        """Drop a bounded batch of the least recently used buckets"""
+        for _ in range(self.evict_batch):
+            try:
+                self._buckets.popitem(last=False)
+            except KeyError:
+                return
+
+
+class SQLiteTokenBucket:
+    """Token buckets stored in a SQLite file so every worker shares the same limits.
+
+    A row idle long enough to have refilled completely means the same as no row,
+    so each process deletes those at most once every ``prune_interval`` seconds.
+    """
+
+    def __init__(self, path: str = RATE_LIMIT_SQLITE_PATH, prune_interval: float = 60.0):
+        self.path = path
+        self.prune_interval = prune_interval
+        self._local = threading.local()
+        self._last_pruned: Dict[str, float] = {}
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=1.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limit_buckets ("
+                "name TEXT NOT NULL, key TEXT NOT NULL, tokens REAL NOT NULL, updated REAL NOT NULL, "
+                "PRIMARY KEY (name, key))"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_rate_limit_buckets_updated ON rate_limit_buckets (name, updated)"
+            )
+            self._local.conn = conn
+        return conn
+
+    def consume(self, name: str, key: str, capacity: int, refill_per_second: float) -> Tuple[bool, float]:
+        try:
+            conn = self._connection()
+            now = time.time()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT tokens, updated FROM rate_limit_buckets WHERE name = ? AND key = ?", (name, key)
+                ).fetchone()
+                tokens, updated = row if row else (capacity, now)
+                tokens = min(capacity, tokens + max(0.0, now - updated) * refill_per_second)
+
+                if tokens >= 1:
+                    tokens -= 1
+                    allowed, retry_after = True, 0.0
+                else:
+                    allowed, retry_after = False, (1 - tokens) / refill_per_second
+
+                conn.execute(
+                    "INSERT OR REPLACE INTO rate_limit_buckets (name, key, tokens, updated) VALUES (?, ?, ?, ?)",
+                    (name, key, tokens, now),
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            self._prune(conn, name, capacity, refill_per_second, now)
+            return allowed, retry_after
+        except Exception as e:
+            # Fail open, a broken limiter store must not lock real users out
+            logging.warning(f"Shared rate limiter unavailable, allowing request: {e}")
+            return True, 0.0
+
+    def _prune(self, conn: sqlite3.Connection, name: str, capacity: int, refill_per_second: float, now: float):
+        last_pruned = self._last_pruned.get(name)
+        if last_pruned is not None and now - last_pruned < self.prune_interval:
+            return
+        self._last_pruned[name] = now
+        try:
+            conn.execute(
+                "DELETE FROM rate_limit_buckets WHERE name = ? AND updated < ?",
+                (name, now - capacity / refill_per_second),
+            )
+        except sqlite3.Error as e:
+            logging.warning(f"Could not prune idle rate limit buckets: {e}")
+
+
+def _create_bucket_store():
+    if RATE_LIMIT_BACKEND == "sqlite":
+        return SQLiteTokenBucket()
+    return MemoryTokenBucket()
+
+
+bucket_store = _create_bucket_store()
+inflight_slots = threading.BoundedSemaphore(MAX_INFLIGHT_REQUESTS)
+
+
+def client_key() -> str:
+    """Rate limit signed-in users by account and everyone else by IP address.
+
+    remote_addr is the real client address because app.py's ProxyFix trusts one
+    X-Forwarded-For hop from the hosting proxy.
+    """
+    user_info = session.get("user")
+    if user_info and user_info.get("id") is not None:
+        return f"user:{user_info['id']}"
+    return f"ip:{request.remote_addr or 'unknown'}"
+
+
+def _reject(status: int, message: str, retry_after: float):
+    retry_after = max(1, int(retry_after + 0.999))
+    if request.path.startswith("/api/"):
+        response = jsonify({"success": False, "error": message})
+    else:
+        flash(message, "error")
+        response = render_template("index.html")
+    return response, status, {"Retry-After": str(retry_after)}
+
+
+def rate_limited(name: str, capacity: int, per_minute: float, shed: bool = False,
+                 exempt: Optional[Callable[[], bool]] = None):
+    """Reject over-limit clients with 429 and, with ``shed=True``, return 503
+    when MAX_INFLIGHT_REQUESTS are already being served, before the view runs.
+
+    Requests for which ``exempt()`` returns True skip both checks. It runs
+    first on every request, so it must be cheap.
+    """
+    refill_per_second = per_minute / 60.0
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if exempt is not None and exempt():
+                return view(*args, **kwargs)
+
+            allowed, retry_after = bucket_store.consume(name, client_key(), capacity, refill_per_second)
+            if not allowed:
+                logging.info(f"Rate limit hit on {name} for {client_key()}")
+                return _reject(429, "Too many requests. Please wait a moment and try again.", retry_after)
+
+            if not shed:
+                return view(*args, **kwargs)
+
+            if not inflight_slots.acquire(blocking=False):
+                logging.warning(f"Shedding {name} request, {MAX_INFLIGHT_REQUESTS} already in flight")
+                return _reject(503, "We're handling a lot of requests right now. Please try again shortly.", 1)
+            try:
+                return view(*args, **kwargs)
+            finally:
+                inflight_slots.release()
+
+        return wrapper
+
+    return decorator
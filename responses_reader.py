@@ -0,0 +1,98 @@
+import json
+import logging
+from typing import Dict, Iterator, Tuple
+
+# A record that has not parsed after this many characters is treated as malformed,
+# so one broken line can never pull the rest of the file into memory
+MAX_RECORD_CHARS = 1 << 20
+
+
+def _looks_incomplete(buffer: str, error: json.JSONDecodeError) -> bool:
+    """True when decoding failed only because the buffer ends mid-record."""
+    if error.pos >= len(buffer.rstrip()):
+        return True
+    # JSON strings cannot contain raw newlines, so an unterminated string is only
+    # incomplete when nothing follows it on a later line
+    return error.msg.startswith("Unterminated string") and "\n" not in buffer[error.pos:]
+
+
+def iter_response_records(path: str, start_offset: int = 0, read_size: int = 1 << 16) -> Iterator[Tuple[int, int, Dict]]:
+    """Stream records out of responses.json as (start, end, record) byte offsets.
+
+    The file started life as a pretty-printed JSON array and later became one
+    JSON object per line, so array brackets and commas between objects are
+    treated as separators and both layouts are read the same way.
+
+    A malformed record, such as a line cut off mid-append, is skipped up to the
+    next line starting with ``{`` and the skipped byte range is logged. A record
+    that is still incomplete at end of file is left unread, so a write that is
+    still in progress is picked up by the next call.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, "rb") as f:
+        f.seek(start_offset)
+        buffer = ""
+        buffer_offset = start_offset  # byte offset of buffer[0]
+        eof = False
+
+        def skip(chars: int, reason: str):
+            nonlocal buffer, buffer_offset
+            skipped = len(buffer[:chars].encode("utf-8"))
+            logging.warning(f"Skipping {reason} in {path} at bytes {buffer_offset}-{buffer_offset + skipped}")
+            buffer_offset += skipped
+            buffer = buffer[chars:]
+
+        while True:
+            position = 0
+            while position < len(buffer) and buffer[position] in " \t\r\n,[]":
+                position += 1
+            if position:
+                buffer_offset += len(buffer[:position].encode("utf-8"))
+                buffer = buffer[position:]
+
+            if buffer:
+                try:
+                    record, end = decoder.raw_decode(buffer)
+                except json.JSONDecodeError as error:
+                    incomplete = _looks_incomplete(buffer, error)
+                    if incomplete and not eof and len(buffer) < MAX_RECORD_CHARS:
+                        pass  # read more below
+                    else:
+                        resync = buffer.find("\n{", 1)
+                        if resync != -1:
+                            skip(resync + 1, "malformed record")
+                            continue
+                        if eof:
+                            if incomplete:
+                                logging.warning(f"Stopping at incomplete record in {path} at byte {buffer_offset}")
+                            else:
+                                skip(len(buffer), "malformed tail")
+                            return
+                        # No next record in the buffer yet: drop whole lines, keep the partial last one
+                        last_newline = buffer.rfind("\n")
+                        skip(last_newline if last_newline > 0 else len(buffer), "malformed record")
+                        continue
+                else:
+                    consumed = len(buffer[:end].encode("utf-8"))
+                    yield buffer_offset, buffer_offset + consumed, record
+                    buffer_offset += consumed
+                    buffer = buffer[end:]
+                    continue
+            elif eof:
+                return
+
+            chunk = f.read(read_size)
+            if not chunk:
+                eof = True
+                continue
+            # Keep incomplete multi-byte sequences for the next read
+            while True:
+                try:
+                    buffer += chunk.decode("utf-8")
+                    break
+                except UnicodeDecodeError:
+                    extra = f.read(1)
+                    if not extra:
+                        buffer += chunk.decode("utf-8", errors="replace")
+                        break
+                    chunk += extra
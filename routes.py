@@ -1,11 +1,9 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash 
 from extensions import db
 from models import EmotionEntry
-from ml_service import predictor
+from ml_service import predictor, MIN_TEXT_LENGTH, MODEL_VERSION
 import logging
 from flask import jsonify
-from google.oauth2 import id_token
-from google.auth.transport import requests as google_requests
 from flask import session
 from models import User
 from datetime import datetime
@@ -18,6 +16,10 @@ from mental_test_dep_service import (
 )
 from typing import List, Dict
 import json
+from rate_limit_service import rate_limited
+from crisis_service import crisis_matcher
+from health_service import health_report, readiness_report, ensure_warm
+from flask import current_app
 
 logging.basicConfig(level=logging.DEBUG)
 
@@ -44,16 +46,68 @@ def contact():
 def mental_test():
     return render_template('mental_test.html')
 
+# Liveness probe for the load balancer
+@routes_bp.route('/healthz')
+def healthz():
+    return jsonify(health_report())
+
+# Readiness probe - 503 until the models are loaded and warmup has run
+@routes_bp.route('/readyz')
+def readyz():
+    # Lazy-startup workers warm up on a readiness probe instead of at boot, and a
+    # failed warmup is retried here rather than leaving the worker unready for good
+    ensure_warm(current_app._get_current_object())
+    report = readiness_report()
+    return jsonify(report), 200 if report["ready"] else 503
+
+def _seen_owner() -> str:
+    """Key seen-question masks by account when signed in, anonymous visitors share their own key"""
+    user_info = session.get('user')
+    if user_info and user_info.get('id') is not None:
+        return f"user:{user_info['id']}"
+    return "anonymous"
+
+def _seen_masks() -> Dict[str, int]:
+    masks = session.get('seen_questions', {}).get(_seen_owner())
+    return masks if isinstance(masks, dict) else {}
+
+def _save_seen_masks(masks: Dict[str, int], persist: bool = True):
+    """Store masks in the session and, for signed-in users, on the account for their other devices"""
+    owner = _seen_owner()
+    seen_questions = {key: value for key, value in session.get('seen_questions', {}).items() if isinstance(value, dict)}
+    seen_questions[owner] = masks
+    session['seen_questions'] = seen_questions
+    if owner == "anonymous" or not persist:
+        return
+    try:
+        user = db.session.get(User, session['user']['id'])
+        if user:
+            user.seen_questions = json.dumps(masks)
+            db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logging.warning(f"Could not save seen questions for {owner}: {e}")
+
+def _load_account_seen_masks(user: User) -> Dict[str, int]:
+    try:
+        masks = json.loads(user.seen_questions or "{}")
+    except ValueError:
+        return {}
+    return {key: value for key, value in masks.items() if isinstance(value, int)} if isinstance(masks, dict) else {}
+
 # Get questions route
 @routes_bp.route("/api/get_questions", methods=["GET", "POST"])
+@rate_limited("get_questions", capacity=30, per_minute=30)
 def api_get_questions():
     try:
         data = request.get_json() or {}
         test_type = data.get("test_type", "depression")
         count = int(data.get("count", 20))
         
+        seen_mask = _seen_masks().get(test_type.lower(), 0)
+
         logging.info(f"Getting {count} questions for {test_type} test")
-        questions = get_formatted_questions(test_type, count)
+        questions = get_formatted_questions(test_type, count, seen_mask)
         
         if not questions:
             return jsonify({"success": False, "error": "Failed to load questions"}), 500
@@ -65,6 +119,7 @@ def api_get_questions():
 
 # Submit test route - Fixed to handle category calculation properly
 @routes_bp.route("/api/submit_test", methods=["POST"])
+@rate_limited("submit_test", capacity=10, per_minute=10, shed=True)
 def api_submit_test():
     try:
         data = request.get_json()
@@ -100,6 +155,14 @@ def api_submit_test():
         # Calculate results using the predictor
         results = predictor.compute_score(formatted_answers)
         
+        # Remember which questions this user has now seen
+        seen_masks = dict(_seen_masks())
+        seen_masks[test_type.lower()] = predictor.mark_seen(
+            seen_masks.get(test_type.lower(), 0),
+            [ans["question_id"] for ans in formatted_answers if isinstance(ans["question_id"], int)]
+        )
+        _save_seen_masks(seen_masks)
+
         # Save responses (optional, for data collection)
         try:
             predictor.save_responses(formatted_answers)
@@ -164,6 +227,10 @@ def google_auth():
         if not token:
             return jsonify({'success': False, 'error': 'No credential token provided'}), 400
 
+        # Imported here so the Google auth stack is only loaded when someone signs in
+        from google.oauth2 import id_token
+        from google.auth.transport import requests as google_requests
+
         CLIENT_ID = "640509902254-0a4l6u5eqmsb2ql8v1af9utork069jaq.apps.googleusercontent.com"
         idinfo = id_token.verify_oauth2_token(token, google_requests.Request(), CLIENT_ID)
 
@@ -186,6 +253,8 @@ def google_auth():
 
         # Store user in session
         session['user'] = {'id': user.id, 'google_id': user.google_id, 'email': user.email, 'name': user.name, 'picture': picture}
+        # Pick up the questions this account already answered, possibly on another device
+        _save_seen_masks(_load_account_seen_masks(user), persist=False)
         flash("Signed in successfully!", "success")
 
         return jsonify({'success': True, 'message': 'Authentication successful', 'user': session['user']})
@@ -199,41 +268,64 @@ def google_auth():
 # Logout route
 @routes_bp.route('/logout')
 def logout():
-    session.pop('user', None)
+    user_info = session.pop('user', None)
+    if user_info:
+        # The account's masks live on the user row; only the anonymous ones stay in the session
+        session['seen_questions'] = {
+            key: value for key, value in session.get('seen_questions', {}).items() if key == "anonymous"
+        }
     flash("Logged out successfully!", "success")
     return redirect(url_for('routes.index'))
 
+def _is_crisis_submission() -> bool:
+    """Crisis entries must always reach the resources page, even when limited or shedding"""
+    return crisis_matcher.is_crisis(request.form.get('emotion_content', ''))
+
 # Submit emotion
 @routes_bp.route('/submit_emotion', methods=['POST'])
+@rate_limited("submit_emotion", capacity=5, per_minute=6, shed=True, exempt=_is_crisis_submission)
 def submit_emotion():
     content = request.form.get('emotion_content', '').strip()
-    min_length = 50
-
-    # Validation check
-    if not content or len(content) < min_length:
-        flash(f"Please share a bit more about how you're feeling (at least {min_length} Words!)", 'error')
-        return redirect(url_for('routes.index'))
+    # Opt-in for clinicians: ?explain=1 (or an explain=1 form field) adds the top contributing terms
+    explain = request.values.get('explain') == '1'
+    # Optional integer seed makes the message/recommendation/resource picks reproducible
+    seed = request.values.get('seed', type=int)
 
     try:
-        # Run ML prediction
-        prediction_result = predictor.predict_mental_health(content)
+        # Run ML prediction (crisis-lexicon hits are flagged even for short texts)
+        prediction_result = predictor.predict_mental_health(content, explain=explain, seed=seed)
+
+        # Validation check
+        if not prediction_result.get('crisis') and (not content or len(content) < MIN_TEXT_LENGTH):
+            flash(f"Please share a bit more about how you're feeling (at least {MIN_TEXT_LENGTH} characters!)", 'error')
+            return redirect(url_for('routes.index'))
 
         user_info = session.get('user')
         user_id = user_info['id'] if user_info else None
 
+        model_scored = prediction_result.get('model_scored', True)
+        crisis_terms = prediction_result.get('crisis_terms', [])
+
         entry = EmotionEntry(
             user_id=user_id,
             content=content,
             ip_address=request.remote_addr,
             prediction_label=prediction_result.get('prediction', 'Unknown'),
-            prediction_confidence=prediction_result.get('confidence', 0),
-            model_version="improved_v1"
+            # Lexicon-only crisis hits have no model confidence
+            prediction_confidence=prediction_result.get('confidence', 0) if model_scored else None,
+            model_version=prediction_result.get('model_version', MODEL_VERSION),
+            crisis_flag=bool(prediction_result.get('crisis')),
+            crisis_terms=", ".join(crisis_terms)[:255] if crisis_terms else None
         )
         db.session.add(entry)
         db.session.commit()
 
+        if prediction_result.get('crisis'):
+            logging.warning(f"Crisis entry {entry.id} flagged for priority review: {crisis_terms}")
+
         label = prediction_result.get('prediction', 'Unknown')
-        confidence = prediction_result.get('confidence', 0)
+        # Lexicon-only crisis hits were never scored, so there is no confidence to show
+        confidence = prediction_result.get('confidence', 0) if model_scored else None
         compassion_message = prediction_result.get('analysis', '')
         recommendations = prediction_result.get('recommendations', [])
         resources = prediction_result.get('resources', [])
@@ -247,7 +339,8 @@ def submit_emotion():
             compassion_message=compassion_message,
             recommendations=recommendations,
             resources=resources,                 
-            show_resources=bool(resources)
+            show_resources=bool(resources),
+            explanation=prediction_result.get('explanation', [])
         )
 
     except Exception as e:
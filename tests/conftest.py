@@ -0,0 +1,16 @@
+import os
+import sys
+
+import pytest
+
+# Importing app must not load the model and warm up at collection time
+os.environ.setdefault("LAZY_STARTUP", "1")
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+
+@pytest.fixture(autouse=True)
+def repo_cwd(monkeypatch):
+    # Data files such as dep-Q.json are opened relative to the working directory
+    monkeypatch.chdir(REPO_ROOT)
@@ -0,0 +1,92 @@
+import random
+
+import pytest
+
+from mental_test_dep_service import MentalTestPredictor
+
+
+@pytest.fixture
+def predictor():
+    predictor = MentalTestPredictor("depression")
+    predictor.ensure_loaded()
+    assert len(predictor.question_ids) == 50
+    return predictor
+
+
+def mask_of(question_ids):
+    return sum(1 << q_id for q_id in question_ids)
+
+
+def assert_valid_sample(predictor, questions, count):
+    assert len(questions) == count
+    assert set(questions) <= set(predictor.question_ids)
+    for q_id, text in questions.items():
+        assert predictor.questions[q_id] == text
+
+
+def test_no_history_samples_uniformly(predictor):
+    questions = predictor.get_random_questions(20, 0)
+    assert_valid_sample(predictor, questions, 20)
+
+
+def test_mostly_unseen_returns_only_unseen(predictor):
+    seen_mask = predictor.mark_seen(0, range(1, 11))
+    for _ in range(50):
+        questions = predictor.get_random_questions(20, seen_mask)
+        assert_valid_sample(predictor, questions, 20)
+        assert not any(seen_mask >> q_id & 1 for q_id in questions)
+
+
+def test_mostly_unseen_with_large_count_returns_only_unseen(predictor):
+    # More than half of the unseen questions requested: takes the scan branch
+    seen_mask = predictor.mark_seen(0, range(1, 11))
+    questions = predictor.get_random_questions(30, seen_mask)
+    assert_valid_sample(predictor, questions, 30)
+    assert not any(seen_mask >> q_id & 1 for q_id in questions)
+
+
+def test_mostly_seen_with_enough_unseen_returns_only_unseen(predictor):
+    seen_mask = predictor.mark_seen(0, range(1, 36))
+    questions = predictor.get_random_questions(10, seen_mask)
+    assert_valid_sample(predictor, questions, 10)
+    assert set(questions) <= set(range(36, 51))
+
+
+def test_count_above_unseen_serves_all_unseen_then_repeats(predictor):
+    # Regression: this used to loop forever in the rejection-sampling branch
+    seen_mask = predictor.mark_seen(0, range(1, 21))
+    questions = predictor.get_random_questions(40, seen_mask)
+    assert_valid_sample(predictor, questions, 40)
+    assert set(range(21, 51)) <= set(questions)
+
+
+def test_count_above_unseen_when_mostly_seen(predictor):
+    seen_mask = predictor.mark_seen(0, range(1, 46))
+    questions = predictor.get_random_questions(20, seen_mask)
+    assert_valid_sample(predictor, questions, 20)
+    assert set(range(46, 51)) <= set(questions)
+
+
+def test_count_larger_than_pool_returns_everything(predictor):
+    assert predictor.get_random_questions(80, 0) == predictor.questions
+
+
+def test_non_positive_count_returns_nothing(predictor):
+    assert predictor.get_random_questions(0, 0) == {}
+    assert predictor.get_random_questions(-5, 0) == {}
+
+
+def test_mark_seen_ignores_unknown_ids_and_resets_when_exhausted(predictor):
+    assert predictor.mark_seen(0, [1, 2, 999]) == mask_of([1, 2])
+    almost_all = predictor.mark_seen(0, range(1, 50))
+    assert predictor.mark_seen(almost_all, [50, 3]) == mask_of([50, 3])
+
+
+def test_random_rounds_never_hang(predictor):
+    rng = random.Random(0)
+    seen_mask = 0
+    for _ in range(200):
+        count = rng.randint(1, 50)
+        questions = predictor.get_random_questions(count, seen_mask)
+        assert_valid_sample(predictor, questions, count)
+        seen_mask = predictor.mark_seen(seen_mask, list(questions))
@@ -0,0 +1,26 @@
+import json
+
+from ml_service import CRISIS_FALLBACK_CONTENT, CRISIS_LABEL, MentalHealthPredictor, load_response_content
+
+
+def test_repo_content_has_crisis_resources():
+    predictor = MentalHealthPredictor()
+    assert predictor.content_loaded
+    assert predictor._get_resources(CRISIS_LABEL)
+
+
+def test_missing_content_file_keeps_crisis_resources(tmp_path):
+    content, _ = load_response_content(str(tmp_path / "missing.json"))
+    assert content[CRISIS_LABEL] is CRISIS_FALLBACK_CONTENT
+    assert content[CRISIS_LABEL].resources
+
+
+def test_content_without_crisis_resources_uses_fallback(tmp_path):
+    path = tmp_path / "content.json"
+    path.write_text(json.dumps({
+        "labels": {"Suicidal Ideation": {"analysis": ["..."], "resources": []}, "stress": {"analysis": ["..."]}},
+        "default": {"analysis": ["..."]},
+    }))
+    content, _ = load_response_content(str(path))
+    assert content[CRISIS_LABEL] is CRISIS_FALLBACK_CONTENT
+    assert content["stress"].analysis == ("...",)
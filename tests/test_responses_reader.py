@@ -0,0 +1,56 @@
+import json
+
+from responses_reader import iter_response_records
+
+
+def _write(tmp_path, text):
+    path = tmp_path / "responses.json"
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def _ids(path, **kwargs):
+    return [record["id"] for _, _, record in iter_response_records(path, **kwargs)]
+
+
+def test_reads_array_then_ndjson_layout(tmp_path):
+    text = json.dumps([{"id": 0}, {"id": 1}], indent=2) + '{"id": 2}\n{"id": 3}\n'
+    assert _ids(_write(tmp_path, text)) == [0, 1, 2, 3]
+
+
+def test_skips_truncated_line_in_the_middle(tmp_path, caplog):
+    lines = [json.dumps({"id": i, "text": "é" * 20}) for i in range(5)]
+    lines[1] = lines[1][:15]
+    path = _write(tmp_path, "\n".join(lines) + "\n")
+    assert _ids(path) == [0, 2, 3, 4]
+    assert "Skipping malformed record" in caplog.text
+
+
+def test_skips_malformed_line_across_small_reads(tmp_path):
+    lines = [json.dumps({"id": i, "text": "x" * 50}) for i in range(5)]
+    lines[2] = '{"id": 2, "text": oops}'
+    path = _write(tmp_path, "\n".join(lines) + "\n")
+    for read_size in (1, 7, 64):
+        assert _ids(path, read_size=read_size) == [0, 1, 3, 4]
+
+
+def test_offsets_resume_after_skipped_line(tmp_path):
+    lines = ['{"id": 0}', '{"id": 1, "bad', '{"id": 2}', '{"id": 3}']
+    path = _write(tmp_path, "\n".join(lines) + "\n")
+    records = list(iter_response_records(path))
+    assert [record["id"] for _, _, record in records] == [0, 2, 3]
+    assert _ids(path, start_offset=records[0][1]) == [2, 3]
+    assert _ids(path, start_offset=records[1][1]) == [3]
+
+
+def test_incomplete_last_line_is_left_for_the_next_run(tmp_path):
+    path = _write(tmp_path, '{"id": 0}\n{"id": 1, "text": "half')
+    records = list(iter_response_records(path))
+    assert [record["id"] for _, _, record in records] == [0]
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(' written"}\n')
+    assert _ids(path, start_offset=records[-1][1]) == [1]
+
+
+def test_repo_responses_file():
+    assert len(list(iter_response_records("responses.json"))) == 6